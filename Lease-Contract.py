@@ -1,5 +1,7 @@
 #!/usr/bin/env python
 import os
+import ast
+import csv
 import sys
 import time
 import logging
@@ -7,7 +9,7 @@ import argparse
 import json
 from typing import Dict, Any, List, Optional
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 import openai
 from fpdf import FPDF, Align, XPos, YPos
 from dotenv import load_dotenv
@@ -31,6 +33,13 @@ DEFAULT_CONFIG = {
         "margin": 15,
         "line_height": 8
     },
+    "clause_search": {
+        "enabled": True,
+        "top_k": 2,
+        "min_score": 0.5,
+        "skip_api": False,
+        "skip_api_score": 0.85
+    },
     "logging_settings": {
         "level": "INFO",
         "max_files": 7,
@@ -40,6 +49,32 @@ DEFAULT_CONFIG = {
 
 CONFIG_PATH = Path.home() / ".config" / "contract_gen" / "config.json"
 ENV_PATH = Path(__file__).parent / ".env"
+CUAD_CLAUSES_PATH = Path(__file__).parent / "CUAD" / "cleaned_file.csv"
+CLAUSE_INDEX_DIR = Path(__file__).parent / "CUAD" / "clause_index"
+CLAUSE_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# CUAD columns holding contract metadata rather than clause text
+NON_CLAUSE_COLUMNS = {"Filename", "Document Name", "Parties", "Agreement Date", "Effective Date", "Expiration Date"}
+# Clauses requested when none are given on the command line
+DEFAULT_CLAUSES = [
+    "Rent payment schedule and methods",
+    "Security deposit terms",
+    "Maintenance responsibilities",
+    "Termination conditions",
+    "Dispute resolution process"
+]
+# Lease clauses with a CUAD counterpart. CUAD covers commercial contracts only, so
+# lease-specific clauses (rent, security deposit, maintenance, lease termination
+# conditions) have no exemplars; "Termination For Convenience" is a narrower concept.
+LEASE_CLAUSE_TYPES = {
+    "governing law": "Governing Law",
+    "renewal terms": "Renewal Term",
+    "notice period to terminate renewal": "Notice Period To Terminate Renewal",
+    "assignment and subletting": "Anti-Assignment",
+    "insurance requirements": "Insurance",
+    "limitation of liability": "Cap On Liability",
+    "liquidated damages": "Liquidated Damages",
+    "third party beneficiaries": "Third Party Beneficiary",
+}
 # endregion
 
 # region Data Classes
@@ -57,14 +92,119 @@ class DocumentSettings:
     output_format: str = "pdf"
     output_dir: Path = Path.cwd() / "contracts"
     anonymize: bool = False
+
+@dataclass
+class ClauseExemplar:
+    clause_type: str
+    text: str
+    source: str
+    score: float = 0.0
 # endregion
 
+class ClauseSearch:
+    """Local embedding search over real CUAD clause exemplars"""
+
+    def __init__(self, index_dir: Path = CLAUSE_INDEX_DIR):
+        import faiss
+
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.index = faiss.read_index(str(index_dir / "index.faiss"))
+        with open(index_dir / "exemplars.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.model_name = meta["model"]
+        self.exemplars = [ClauseExemplar(**e) for e in meta["exemplars"]]
+        self.type_ranges = self._compute_type_ranges()
+        self._model = None
+
+    @classmethod
+    def build(cls, csv_path: Path = CUAD_CLAUSES_PATH, index_dir: Path = CLAUSE_INDEX_DIR,
+              model_name: str = CLAUSE_MODEL) -> "ClauseSearch":
+        """Embed CUAD clause spans and save the index"""
+        import faiss
+        import numpy as np
+
+        exemplars = sorted(cls._load_exemplars(csv_path), key=lambda e: e.clause_type)
+        model = cls._load_model(model_name)
+        vectors = model.encode(
+            [e.text for e in exemplars],
+            batch_size=64,
+            normalize_embeddings=True,
+            show_progress_bar=True
+        )
+        index = faiss.IndexFlatIP(vectors.shape[1])
+        index.add(np.asarray(vectors, dtype=np.float32))
+
+        index_dir.mkdir(parents=True, exist_ok=True)
+        faiss.write_index(index, str(index_dir / "index.faiss"))
+        with open(index_dir / "exemplars.json", "w", encoding="utf-8") as f:
+            json.dump({"model": model_name, "exemplars": [asdict(e) for e in exemplars]}, f)
+        return cls(index_dir)
+
+    @staticmethod
+    def _load_exemplars(csv_path: Path) -> List[ClauseExemplar]:
+        """Extract unique clause spans per clause type from the CUAD master CSV"""
+        csv.field_size_limit(sys.maxsize)
+        seen = set()
+        exemplars = []
+        with open(csv_path, encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                for column, value in row.items():
+                    if column in NON_CLAUSE_COLUMNS or column.endswith("Answer") or not value:
+                        continue
+                    for text in ast.literal_eval(value):
+                        text = " ".join(text.split())
+                        if (column, text) in seen:
+                            continue
+                        seen.add((column, text))
+                        exemplars.append(ClauseExemplar(column, text, row["Filename"]))
+        return exemplars
+
+    @staticmethod
+    def _load_model(model_name: str):
+        """Load the sentence embedding model (imported lazily, torch is slow to import)"""
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+
+    def _compute_type_ranges(self) -> Dict[str, tuple]:
+        """Map each clause type to its contiguous id range in the index"""
+        ranges = {}
+        for i, exemplar in enumerate(self.exemplars):
+            start, _ = ranges.get(exemplar.clause_type, (i, i))
+            ranges[exemplar.clause_type] = (start, i + 1)
+        return ranges
+
+    @property
+    def clause_types(self) -> List[str]:
+        return list(self.type_ranges)
+
+    def search(self, query: str, clause_type: Optional[str] = None, top_k: int = 3) -> List[ClauseExemplar]:
+        """Return the top-k exemplars most similar to the query"""
+        import faiss
+        import numpy as np
+
+        if self._model is None:
+            self._model = self._load_model(self.model_name)
+        vector = self._model.encode([query], normalize_embeddings=True)
+
+        params = None
+        if clause_type is not None:
+            if clause_type not in self.type_ranges:
+                raise ValueError(f"Unknown clause type: {clause_type}")
+            params = faiss.SearchParameters(sel=faiss.IDSelectorRange(*self.type_ranges[clause_type]))
+        scores, ids = self.index.search(np.asarray(vector, dtype=np.float32), top_k, params=params)
+
+        return [
+            ClauseExemplar(**{**asdict(self.exemplars[i]), "score": float(score)})
+            for score, i in zip(scores[0], ids[0]) if i >= 0
+        ]
+
 class ContractGenerator:
     """Core class handling contract generation workflow"""
     
-    def __init__(self):
+    def __init__(self, clause_search: Optional[ClauseSearch] = None):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.config = self._load_config()
+        self.clause_search = clause_search
         self._setup_environment()
         
     def _load_config(self) -> Dict[str, Any]:
@@ -107,8 +247,13 @@ class ContractGenerator:
 
     def generate_contract(self, details: ContractDetails) -> str:
         """Generate contract text using LLM API"""
+        exemplars = self._retrieve_exemplars(details)
+        if self._exemplars_suffice(details, exemplars):
+            self.logger.info("Close CUAD exemplars found for every clause, skipping API call")
+            return self._assemble_from_exemplars(details, exemplars)
+
         client = self._create_api_client()
-        prompt = self._build_prompt(details)
+        prompt = self._build_prompt(details, exemplars)
         
         try:
             response = client.chat.completions.create(
@@ -122,8 +267,72 @@ class ContractGenerator:
             self.logger.error("API request failed: %s", e)
             sys.exit(1)
 
-    def _build_prompt(self, details: ContractDetails) -> str:
+    def _search_settings(self) -> Dict[str, Any]:
+        """Clause search settings, with defaults filled in for keys missing from the config file"""
+        return {**DEFAULT_CONFIG["clause_search"], **self.config.get("clause_search", {})}
+
+    def _retrieve_exemplars(self, details: ContractDetails) -> Dict[str, List[ClauseExemplar]]:
+        """Look up CUAD exemplars for each requested clause that maps to a CUAD clause type"""
+        settings = self._search_settings()
+        if self.clause_search is None or not settings["enabled"]:
+            return {}
+        exemplars = {}
+        for clause in details.clauses:
+            clause_type = LEASE_CLAUSE_TYPES.get(clause.strip().lower())
+            if clause_type is None or clause_type not in self.clause_search.type_ranges:
+                continue
+            matches = self.clause_search.search(clause, clause_type=clause_type, top_k=settings["top_k"])
+            matches = [m for m in matches if m.score >= settings["min_score"]]
+            if matches:
+                exemplars[clause] = matches
+        return exemplars
+
+    def _exemplars_suffice(self, details: ContractDetails,
+                           exemplars: Dict[str, List[ClauseExemplar]]) -> bool:
+        """Check whether the API may be skipped: opted in and every clause has a close mapped exemplar"""
+        settings = self._search_settings()
+        if not settings["skip_api"] or not details.clauses:
+            return False
+        return all(
+            clause in exemplars and exemplars[clause][0].score >= settings["skip_api_score"]
+            for clause in details.clauses
+        )
+
+    def _assemble_from_exemplars(self, details: ContractDetails,
+                                 exemplars: Dict[str, List[ClauseExemplar]]) -> str:
+        """Assemble a contract locally from the best exemplar of each clause"""
+        governing_law = f"This agreement shall be governed by the laws applicable in {details.jurisdiction}."
+        sections = [
+            "LEASE AGREEMENT",
+            "NOTE: The clauses below are verbatim excerpts from commercial contracts in the CUAD "
+            "dataset (source files listed). Review and adapt them before use.",
+            f"This {details.duration_months}-month lease agreement is made between "
+            f"{details.owner} (\"Owner\") and {details.tenant} (\"Tenant\") "
+            f"for the property at {details.property_address}.",
+        ]
+        for number, (clause, matches) in enumerate(exemplars.items(), start=1):
+            best = matches[0]
+            # A CUAD choice-of-law span names another contract's jurisdiction
+            if best.clause_type == "Governing Law":
+                sections.append(f"{number}. {clause}\n{governing_law}")
+                continue
+            sections.append(f"{number}. {clause}\n{best.text}\n[Source: CUAD, {best.source}]")
+        if not any(m[0].clause_type == "Governing Law" for m in exemplars.values()):
+            sections.append(governing_law)
+        sections.append("Owner: ____________________        Tenant: ____________________")
+        return "\n\n".join(sections)
+
+    def _build_prompt(self, details: ContractDetails,
+                      exemplars: Optional[Dict[str, List[ClauseExemplar]]] = None) -> str:
         """Construct detailed prompt for contract generation"""
+        clause_list = "\n".join(f"• {c}" for c in details.clauses)
+        reference = ""
+        if exemplars:
+            reference = "\n\nReference wording from real contracts (adapt to this lease, do not copy verbatim):\n"
+            reference += "\n".join(
+                f"[{clause}] {match.text}"
+                for clause, matches in exemplars.items() for match in matches
+            )
         return f"""Generate a comprehensive {details.duration_months}-month lease agreement between:
 - Tenant: {details.tenant}
 - Owner: {details.owner}
@@ -131,7 +340,7 @@ class ContractGenerator:
 Jurisdiction: {details.jurisdiction}
 
 Include these key clauses:
-{'\n'.join(f'• {c}' for c in details.clauses)}
+{clause_list}{reference}
 
 Structure the document with:
 1. Title page
@@ -264,24 +473,88 @@ def configure_logging(level: str = "INFO") -> None:
         ]
     )
 
-def parse_arguments() -> argparse.Namespace:
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
     """Parse command-line arguments"""
+    argv = sys.argv[1:] if argv is None else argv
+    # Plain `-t ... -o ... -a ...` invocations keep working as the generate command
+    if not argv or argv[0] not in ("generate", "search", "build-index", "-h", "--help"):
+        argv = ["generate"] + argv
+
     parser = argparse.ArgumentParser(description="Automated Contract Generation System")
-    parser.add_argument("-t", "--tenant", required=True, help="Tenant's full name")
-    parser.add_argument("-o", "--owner", required=True, help="Property owner's name")
-    parser.add_argument("-a", "--address", required=True, help="Property address")
-    parser.add_argument("-d", "--duration", type=int, default=3, help="Lease duration in months")
-    parser.add_argument("-f", "--format", choices=["pdf", "txt"], default="pdf", help="Output format")
-    parser.add_argument("--anonymize", action="store_true", help="Remove personal information")
-    return parser.parse_args()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="Generate a lease contract (default)")
+    generate.add_argument("-t", "--tenant", required=True, help="Tenant's full name")
+    generate.add_argument("-o", "--owner", required=True, help="Property owner's name")
+    generate.add_argument("-a", "--address", required=True, help="Property address")
+    generate.add_argument("-d", "--duration", type=int, default=3, help="Lease duration in months")
+    generate.add_argument("-f", "--format", choices=["pdf", "txt"], default="pdf", help="Output format")
+    generate.add_argument("--anonymize", action="store_true", help="Remove personal information")
+    generate.add_argument("--no-exemplars", action="store_true", help="Do not use local CUAD clause exemplars")
+    generate.add_argument(
+        "-c", "--clause", action="append", dest="clauses",
+        help="Clause to include, repeatable (default: %s). Clauses with CUAD exemplars: %s" % (
+            "; ".join(DEFAULT_CLAUSES), "; ".join(LEASE_CLAUSE_TYPES))
+    )
+
+    search = subparsers.add_parser("search", help="Search CUAD clause exemplars")
+    search.add_argument("query", help="Clause description or wording to look up")
+    search.add_argument("-c", "--clause-type", help="Restrict results to one CUAD clause type")
+    search.add_argument("-k", "--top-k", type=int, default=3, help="Number of exemplars to return")
+
+    build = subparsers.add_parser("build-index", help="Build the CUAD clause exemplar index")
+    build.add_argument("--csv", type=Path, default=CUAD_CLAUSES_PATH, help="CUAD master clauses CSV")
+    build.add_argument("--model", default=CLAUSE_MODEL, help="Sentence embedding model")
+    return parser.parse_args(argv)
+
+def run_search(args: argparse.Namespace) -> None:
+    """Print the closest clause exemplars for a query"""
+    if not (CLAUSE_INDEX_DIR / "index.faiss").exists():
+        logging.error("No clause exemplar index found at %s, run `build-index` first", CLAUSE_INDEX_DIR)
+        sys.exit(1)
+    searcher = ClauseSearch(CLAUSE_INDEX_DIR)
+
+    clause_type = None
+    if args.clause_type is not None:
+        types = {t.lower(): t for t in searcher.clause_types}
+        clause_type = types.get(args.clause_type.strip().lower())
+        if clause_type is None:
+            logging.error("Unknown clause type %r, choose one of: %s",
+                          args.clause_type, ", ".join(sorted(searcher.clause_types)))
+            sys.exit(1)
+
+    searcher.search(args.query)  # warm up the embedding model
+    search_start = time.perf_counter()
+    results = searcher.search(args.query, clause_type=clause_type, top_k=args.top_k)
+    elapsed_ms = (time.perf_counter() - search_start) * 1000
+
+    for rank, exemplar in enumerate(results, start=1):
+        print(f"{rank}. [{exemplar.clause_type}] score={exemplar.score:.3f} ({exemplar.source})")
+        print(f"   {exemplar.text}\n")
+    logging.info(f"Searched {searcher.index.ntotal} exemplars in {elapsed_ms:.1f}ms")
+
+def load_clause_search() -> Optional[ClauseSearch]:
+    """Load the clause exemplar index if it has been built"""
+    if not (CLAUSE_INDEX_DIR / "index.faiss").exists():
+        logging.info("No clause exemplar index found, run `build-index` to enable it")
+        return None
+    return ClauseSearch(CLAUSE_INDEX_DIR)
 
 def main():
     """Main execution flow"""
     start_time = time.time()
     args = parse_arguments()
     configure_logging()
-    
-    generator = ContractGenerator()
+
+    if args.command == "build-index":
+        searcher = ClauseSearch.build(args.csv, model_name=args.model)
+        logging.info(f"Indexed {searcher.index.ntotal} clause exemplars in {time.time() - start_time:.2f}s")
+        return
+    if args.command == "search":
+        run_search(args)
+        return
+
+    generator = ContractGenerator(None if args.no_exemplars else load_clause_search())
     formatter = DocumentFormatter(DocumentSettings(
         output_format=args.format,
         anonymize=args.anonymize
@@ -292,13 +565,7 @@ def main():
         owner=args.owner,
         property_address=args.address,
         duration_months=args.duration,
-        clauses=[
-            "Rent payment schedule and methods",
-            "Security deposit terms",
-            "Maintenance responsibilities",
-            "Termination conditions",
-            "Dispute resolution process"
-        ]
+        clauses=args.clauses or DEFAULT_CLAUSES
     )
     
     try:
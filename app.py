@@ -1,24 +1,90 @@
+import time
+import threading
+
 import streamlit as st
 from utils import qa_pipeline
 
-chain = qa_pipeline()
+# Prompt run once after loading so the first user query doesn't pay for CUDA warm-up
+WARMUP_PROMPT = "[INST] Hello [/INST]"
+
+class ChainLoader:
+    """
+    Build the QA chain in a background thread and expose its readiness
+    """
+
+    def __init__(self):
+        self.chain = None
+        self.error = None
+        self.warning = None
+        self.status = "Loading the model..."
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._load, daemon=True)
+        self.thread.start()
+
+    def _load(self):
+        start_time = time.time()
+        try:
+            chain = qa_pipeline()
+        except Exception as e:
+            self.error = e
+            self.ready.set()
+            return
+        print(f"Chain loaded in {time.time() - start_time:.2f}s")
+
+        # Generate a single token straight through the HF pipeline; a full chain
+        # call would add a whole generation to time-to-first-interactive.
+        # A failed warm-up only costs the first query its speed, keep the chain.
+        self.status = "Warming up the model..."
+        try:
+            llm = chain.combine_documents_chain.llm_chain.llm
+            llm.pipeline(WARMUP_PROMPT, max_new_tokens=1)
+        except Exception as e:
+            self.warning = f"Model warm-up failed, the first answer may be slow: {e}"
+        print(f"Ready to answer after {time.time() - start_time:.2f}s")
+        self.chain = chain
+        self.ready.set()
+
+# Shared by every session of this server process
+@st.cache_resource
+def get_loader():
+    return ChainLoader()
 
 def main():
-    global chain
     # Set the title of the web application
     st.title('Indian Law Q&A Bot')
 
+    # Start loading the chain without blocking the page
+    loader = get_loader()
+
     # Initialize the session state if it doesn't exist
     if 'chat_log' not in st.session_state:
         st.session_state.chat_log = []
 
+    # Offer a retry that drops the failed loader from the cache
+    if loader.error is not None:
+        st.error(f"Failed to load the model: {loader.error}")
+        if st.button("Retry"):
+            get_loader.clear()
+            st.experimental_rerun()
+        return
+
+    # While loading, show the indicator and poll until the chain is ready
+    if not loader.ready.is_set():
+        st.text_input("You:", disabled=True)
+        with st.spinner(loader.status):
+            loader.ready.wait(timeout=2)
+        st.experimental_rerun()
+
+    if loader.warning is not None:
+        st.warning(loader.warning)
+
     # Get the user's question
     user_input = st.text_input("You:")
 
     # On user input, generate response and add to the chat log
     if user_input:
         # Generate the answer
-        bot_output = chain(user_input)
+        bot_output = loader.chain(user_input)
         bot_output = bot_output['result']
         # Add the user input and bot output to the chat log
         st.session_state.chat_log.append({"User": user_input, "Bot": bot_output})
@@ -0,0 +1,174 @@
+# Importing Dependencies
+import os
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from utils import load_vector_store, load_llm, set_custom_prompt_template
+
+# Number of retrieved chunks per question, same as the Streamlit chain
+TOP_K = 2
+
+# LLM loaded once per worker process
+_llm = None
+
+# Read the questions
+def read_questions(path):
+    """
+    Read questions from a JSONL file, using "line-<n>" (1-based) when no id is given
+    """
+    questions = []
+    seen = set()
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            question_id = record.get("id", f"line-{line_number}")
+            if not isinstance(question_id, (str, int)) or isinstance(question_id, bool):
+                raise ValueError(f"Question id on line {line_number} of {path} must be a string or integer, "
+                                 f"got {question_id!r}")
+            if question_id in seen:
+                raise ValueError(f"Duplicate question id {question_id!r} on line {line_number} of {path}")
+            seen.add(question_id)
+            questions.append({"id": question_id, "question": record["question"]})
+
+    return questions
+
+# Return the ids already answered
+def read_checkpoint(path):
+    """
+    Return the ids of the questions already written to the output file
+    """
+    if not os.path.exists(path):
+        return set()
+
+    # Drop a partially written last line from an interrupted run, so new
+    # records are appended after the last complete one
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+    done = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["id"])
+            except (ValueError, KeyError):
+                continue
+
+    return done
+
+# Return the sources of a chunk
+def chunk_sources(doc):
+    """
+    Return every source of a chunk, including near-duplicates collapsed at ingest
+    """
+    return doc.metadata.get("sources") or [{"source": doc.metadata.get("source"), "page": doc.metadata.get("page")}]
+
+# Retrieve the context of every question
+def retrieve(db, embeddings, questions, k=TOP_K):
+    """
+    Embed all questions in one batch and search the index in one call
+    """
+    vectors = np.array(embeddings.embed_documents([q["question"] for q in questions]), dtype=np.float32)
+    _, indices = db.index.search(vectors, k)
+
+    return [
+        [db.docstore.search(db.index_to_docstore_id[i]) for i in row if i >= 0]
+        for row in indices
+    ]
+
+# Load the LLM in a worker process
+def _init_worker():
+    """
+    Load the LLM once per worker process
+    """
+    global _llm
+    _llm = load_llm()
+
+# Generate an answer
+def _answer(task):
+    """
+    Run the LLM on a prepared prompt
+    """
+    question_id, prompt = task
+
+    return question_id, _llm(prompt)
+
+# Run the batch
+def run_batch(input_path, output_path, workers=1, k=TOP_K, quantization=None):
+    """
+    Answer every pending question and stream the results to the output JSONL
+    """
+    start_time = time.time()
+    questions = read_questions(input_path)
+    done = read_checkpoint(output_path)
+    pending = [q for q in questions if q["id"] not in done]
+    print(f"{len(questions)} questions, {len(done)} already answered, {len(pending)} pending")
+    if not pending:
+        return
+
+    # Retrieve the context for all pending questions at once
+    from langchain.embeddings import HuggingFaceEmbeddings
+
+    embeddings = HuggingFaceEmbeddings()
+    db = load_vector_store(quantization, embeddings=embeddings)
+    contexts = retrieve(db, embeddings, pending, k)
+    print(f"Retrieved context for {len(pending)} questions in {time.time() - start_time:.2f}s")
+
+    # Build the prompts, generation only needs these
+    prompt = set_custom_prompt_template()
+    by_id = {}
+    tasks = []
+    for question, docs in zip(pending, contexts):
+        by_id[question["id"]] = (question, docs)
+        context = "\n\n".join(doc.page_content for doc in docs)
+        tasks.append((question["id"], prompt.format(context=context, question=question["question"])))
+
+    # Generate the answers, in-process or across worker processes. A worker
+    # that fails to load the LLM breaks the executor, so its error surfaces
+    # as BrokenProcessPool instead of hanging the batch.
+    if workers > 1:
+        print(f"Starting {workers} workers, each loads its own copy of the LLM onto the GPU")
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker)
+        answers = (future.result() for future in as_completed([pool.submit(_answer, task) for task in tasks]))
+    else:
+        pool = None
+        _init_worker()
+        answers = map(_answer, tasks)
+
+    # Stream each answer to the output file as soon as it is ready
+    try:
+        with open(output_path, "a", encoding="utf-8") as f:
+            for count, (question_id, answer) in enumerate(answers, start=1):
+                question, docs = by_id[question_id]
+                sources = [source for doc in docs for source in chunk_sources(doc)]
+                record = {"id": question_id, "question": question["question"], "answer": answer, "sources": sources}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                print(f"[{count}/{len(tasks)}] answered {question_id}")
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    print(f"Batch completed in {time.time() - start_time:.2f}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions offline")
+    parser.add_argument("input", help="JSONL file with a 'question' (and optional 'id') per line")
+    parser.add_argument("output", help="JSONL file answers are appended to, resumed if it exists")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="Generation worker processes. Each loads its own 4-bit Llama-2 copy onto the GPU, "
+                             "so only raise this when the GPU memory fits that many copies")
+    parser.add_argument("-k", type=int, default=TOP_K, help="Chunks retrieved per question")
+    parser.add_argument("--quantization", choices=["fp16", "int8"], help="Search a quantized index")
+    args = parser.parse_args()
+
+    run_batch(args.input, args.output, workers=args.workers, k=args.k, quantization=args.quantization)
@@ -1,20 +1,121 @@
 # Importing Dependencies
+import os
+import re
+import sys
+import time
+import zlib
+from collections import defaultdict
+
+import numpy as np
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.document_loaders import PyPDFLoader, DirectoryLoader
 from langchain.embeddings import HuggingFaceEmbeddings
 from langchain.vectorstores import FAISS
 
+from quantize import QUANTIZERS, VECTORS_FILE, build_quantized, quantized_path
+
 # Dataset Directory Path
 DATASET = "dataset/"
 
 # Faiss Index Path
 FAISS_INDEX = "vectorstore/"
 
+# MinHash / LSH settings for near-duplicate chunk elimination
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+LSH_BANDS = 16
+DEDUP_THRESHOLD = 0.8
+
+# Prime just above 2**32, so (a * x + b) stays inside uint64 for 32-bit shingle hashes
+_HASH_PRIME = np.uint64(4294967311)
+
+# Create the MinHash permutations
+def _minhash_permutations(num_perm=NUM_PERM, seed=1):
+    """
+    Create the random (a, b) pairs of the MinHash hash family
+    """
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, 2**31 - 1, size=num_perm).astype(np.uint64)
+    b = rng.randint(0, 2**31 - 1, size=num_perm).astype(np.uint64)
+
+    return a, b
+
+# Return the shingles of a chunk
+def shingles(text, size=SHINGLE_SIZE):
+    """
+    Hash the word n-grams of a text to 32-bit integers
+    """
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < size:
+        words = words + [""] * (size - len(words))
+    grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+# Return the MinHash signature of a chunk
+def minhash(text, permutations):
+    """
+    Compute the MinHash signature of a text
+    """
+    a, b = permutations
+    hashes = shingles(text)
+    # One row per permutation, one column per shingle
+    permuted = (np.outer(a, hashes) + b[:, None]) % _HASH_PRIME
+
+    return permuted.min(axis=1)
+
+# Collapse near-duplicate chunks
+def deduplicate(chunks, threshold=DEDUP_THRESHOLD, num_perm=NUM_PERM, bands=LSH_BANDS):
+    """
+    Collapse near-duplicate chunks using MinHash + LSH.
+
+    The first chunk of each group is kept; the source and page of every
+    chunk it absorbs are recorded in its ``sources`` metadata.
+    """
+    rows = num_perm // bands
+    permutations = _minhash_permutations(num_perm)
+    buckets = defaultdict(list)
+    signatures = []
+    kept = []
+
+    for chunk in chunks:
+        signature = minhash(chunk.page_content, permutations)
+        provenance = {"source": chunk.metadata.get("source"), "page": chunk.metadata.get("page")}
+        band_keys = [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(bands)]
+
+        # Look for a kept chunk sharing at least one LSH band
+        duplicate_of = None
+        candidates = {idx for key in band_keys for idx in buckets.get(key, ())}
+        for idx in sorted(candidates):
+            if np.mean(signatures[idx] == signature) >= threshold:
+                duplicate_of = idx
+                break
+
+        if duplicate_of is not None:
+            kept[duplicate_of].metadata["sources"].append(provenance)
+            continue
+
+        chunk.metadata["sources"] = [provenance]
+        for key in band_keys:
+            buckets[key].append(len(kept))
+        signatures.append(signature)
+        kept.append(chunk)
+
+    return kept
+
+# Return the on-disk size of the index
+def index_size(files=("index.faiss", "index.pkl"), path=FAISS_INDEX):
+    """
+    Return the total size in bytes of the given vector store files
+    """
+    return sum(os.path.getsize(os.path.join(path, f)) for f in files if os.path.exists(os.path.join(path, f)))
+
 # Create Vector Store and Index
-def embed_all():
+def embed_all(dedup=True):
     """
     Embed all files in the dataset directory
     """
+    start_time = time.time()
     # Create the document loader
     loader = DirectoryLoader(DATASET, glob="*.pdf", loader_cls=PyPDFLoader)
     # Load the documents
@@ -23,12 +124,28 @@ def embed_all():
     splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=200)
     # Split the documents into chunks
     chunks = splitter.split_documents(documents)
+    print(f"Split {len(documents)} pages into {len(chunks)} chunks")
+    # Collapse near-duplicate chunks
+    if dedup:
+        dedup_start = time.time()
+        chunks_before = len(chunks)
+        chunks = deduplicate(chunks)
+        print(f"Deduplicated {chunks_before} -> {len(chunks)} chunks in {time.time() - dedup_start:.2f}s")
     # Load the embeddings
     embeddings = HuggingFaceEmbeddings()
     # Create the vector store
     vector_store = FAISS.from_documents(chunks, embeddings)
     # Save the vector store
     vector_store.save_local(FAISS_INDEX)
+    # Report index size and ingest time
+    print(f"Indexed {vector_store.index.ntotal} vectors, {index_size() / 2**20:.1f} MiB on disk")
+    print(f"Ingest completed in {time.time() - start_time:.2f}s")
+    # Rebuild any quantized copies so they match the new index
+    rebuilt = [qtype for qtype in QUANTIZERS if os.path.exists(quantized_path(qtype, FAISS_INDEX))]
+    if rebuilt:
+        build_quantized(rebuilt, FAISS_INDEX)
+        quantized_files = [os.path.basename(quantized_path(qtype)) for qtype in rebuilt] + [VECTORS_FILE]
+        print(f"Rebuilt quantized copies ({', '.join(rebuilt)}), {index_size(quantized_files) / 2**20:.1f} MiB on disk")
 
 if __name__ == "__main__":
-    embed_all()
\ No newline at end of file
+    embed_all(dedup="--no-dedup" not in sys.argv[1:])
@@ -0,0 +1,167 @@
+# Importing Dependencies
+import os
+import argparse
+
+import faiss
+import numpy as np
+
+# Faiss Index Path
+FAISS_INDEX = "vectorstore/"
+
+# Float32 sidecar used for exact rescoring
+VECTORS_FILE = "vectors.npy"
+
+# Supported scalar quantizers (QT_8bit trains a min/max range per dimension)
+QUANTIZERS = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+# Number of quantized candidates fetched per result before rescoring
+RESCORE_FACTOR = 4
+
+class RescoringIndex:
+    """
+    Search a scalar-quantized index, then rescore the top candidates
+    exactly against the memory-mapped float32 sidecar
+    """
+
+    def __init__(self, index, vectors, factor=RESCORE_FACTOR):
+        self.index = index
+        self.vectors = vectors
+        self.factor = factor
+        self.d = index.d
+        self.ntotal = index.ntotal
+
+    def search(self, x, k):
+        """
+        Return the exact scores and ids of the k best vectors, using the
+        metric of the quantized index (squared L2 or inner product)
+        """
+        inner_product = self.index.metric_type == faiss.METRIC_INNER_PRODUCT
+        _, candidates = self.index.search(x, k * self.factor)
+        distances = np.full((len(x), k), -np.inf if inner_product else np.inf, dtype=np.float32)
+        labels = np.full((len(x), k), -1, dtype=np.int64)
+
+        for row, (query, ids) in enumerate(zip(x, candidates)):
+            ids = np.sort(ids[ids >= 0])
+            stored = np.asarray(self.vectors[ids])
+            if inner_product:
+                exact = stored @ query
+                top = np.argsort(-exact)[:k]
+            else:
+                exact = ((stored - query) ** 2).sum(axis=1)
+                top = np.argsort(exact)[:k]
+            distances[row, :len(top)] = exact[top]
+            labels[row, :len(top)] = ids[top]
+
+        return distances, labels
+
+    def reconstruct(self, key):
+        """
+        Return the stored float32 vector
+        """
+        return np.array(self.vectors[key])
+
+# Return the path of a quantized index
+def quantized_path(qtype, path=FAISS_INDEX):
+    """
+    Return the file path of the index quantized with qtype
+    """
+    return os.path.join(path, f"index.{qtype}.faiss")
+
+# Write a file atomically
+def _write_atomically(target, write):
+    """
+    Write to a temp file in the same directory, then rename it over the target.
+
+    Replicas that already mmap or opened the old file keep reading the old inode.
+    """
+    tmp = f"{target}.tmp"
+    write(tmp)
+    os.replace(tmp, target)
+
+# Save the float32 sidecar
+def _save_vectors(vectors, tmp):
+    """
+    Save the vectors to an exact file name (np.save would append .npy)
+    """
+    with open(tmp, "wb") as f:
+        np.save(f, vectors)
+
+# Build the quantized indexes and the float32 sidecar
+def build_quantized(qtypes, path=FAISS_INDEX):
+    """
+    Quantize the saved flat index with each qtype and write the float32 sidecar once.
+
+    Quantized indexes that already exist are rebuilt too, since they share the sidecar.
+    """
+    if isinstance(qtypes, str):
+        qtypes = [qtypes]
+    qtypes = [q for q in QUANTIZERS if q in qtypes or os.path.exists(quantized_path(q, path))]
+    flat = faiss.read_index(os.path.join(path, "index.faiss"))
+    vectors = flat.reconstruct_n(0, flat.ntotal)
+    _write_atomically(os.path.join(path, VECTORS_FILE), lambda tmp: _save_vectors(vectors, tmp))
+
+    for qtype in qtypes:
+        index = faiss.IndexScalarQuantizer(flat.d, QUANTIZERS[qtype], flat.metric_type)
+        index.train(vectors)
+        index.add(vectors)
+        _write_atomically(quantized_path(qtype, path), lambda tmp: faiss.write_index(index, tmp))
+
+# Return the quantized index
+def load_quantized_index(qtype, rescore=True, path=FAISS_INDEX):
+    """
+    Load the quantized index, optionally wrapped for exact rescoring
+    """
+    index = faiss.read_index(quantized_path(qtype, path))
+    if not rescore:
+        return index
+    vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+
+    return RescoringIndex(index, vectors)
+
+# Compare memory footprint and recall
+def compare(k=10, num_queries=200, path=FAISS_INDEX, seed=0):
+    """
+    Print the in-memory size and recall@k of each quantizer against the flat index
+    """
+    flat = faiss.read_index(os.path.join(path, "index.faiss"))
+    vectors = flat.reconstruct_n(0, flat.ntotal)
+
+    # Midpoints of random vector pairs, so a query never matches itself exactly
+    rng = np.random.RandomState(seed)
+    pairs = rng.randint(0, flat.ntotal, size=(num_queries, 2))
+    queries = ((vectors[pairs[:, 0]] + vectors[pairs[:, 1]]) / 2).astype(np.float32)
+    _, truth = flat.search(queries, k)
+
+    print(f"{'index':<14}{'memory (MiB)':>14}{f'recall@{k}':>12}")
+    print(f"{'float32':<14}{vectors.nbytes / 2**20:>14.1f}{1.0:>12.3f}")
+    missing = [qtype for qtype in QUANTIZERS if not os.path.exists(quantized_path(qtype, path))]
+    if missing:
+        build_quantized(missing, path)
+    for qtype in QUANTIZERS:
+        for rescore in (False, True):
+            index = load_quantized_index(qtype, rescore, path)
+            base = index.index if rescore else index
+            memory = base.sa_code_size() * base.ntotal / 2**20
+            _, found = index.search(queries, k)
+            recall = np.mean([len(set(f) & set(t)) / k for f, t in zip(found, truth)])
+            name = f"{qtype}+rescore" if rescore else qtype
+            print(f"{name:<14}{memory:>14.1f}{recall:>12.3f}")
+    print("Rescoring reads the float32 sidecar through mmap; only the touched pages become resident.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scalar-quantized vector storage")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Quantize the saved index")
+    build_parser.add_argument("--type", choices=QUANTIZERS, default="int8", help="Quantizer")
+    compare_parser = subparsers.add_parser("compare", help="Compare memory footprint and recall")
+    compare_parser.add_argument("-k", type=int, default=10, help="Neighbours per query")
+    compare_parser.add_argument("--queries", type=int, default=200, help="Number of sampled queries")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_quantized(args.type)
+    else:
+        compare(k=args.k, num_queries=args.queries)
@@ -1,10 +1,5 @@
-# Importing Dependencies
-from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
-
-from langchain import PromptTemplate, HuggingFacePipeline
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.vectorstores import FAISS
-from langchain.chains import RetrievalQA
+# Heavy dependencies (transformers, langchain, faiss) are imported inside the
+# functions that need them, so importing utils stays cheap for the UI.
 
 # Faiss Index Path
 FAISS_INDEX = "vectorstore/"
@@ -26,6 +21,8 @@ def set_custom_prompt_template():
     """
     Set the custom prompt template for the LLMChain
     """
+    from langchain import PromptTemplate
+
     prompt = PromptTemplate(template=custom_prompt_template, input_variables=["context", "question"])
 
     return prompt
@@ -35,6 +32,9 @@ def load_llm():
     """
     Load the LLM
     """
+    from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
+    from langchain import HuggingFacePipeline
+
     # Model ID
     repo_id = 'meta-llama/Llama-2-7b-chat-hf'
 
@@ -69,6 +69,8 @@ def retrieval_qa_chain(llm, prompt, db):
     """
     Create the Retrieval QA chain
     """
+    from langchain.chains import RetrievalQA
+
     # Create the chain
     qa_chain = RetrievalQA.from_chain_type(
         llm=llm,
@@ -80,16 +82,42 @@ def retrieval_qa_chain(llm, prompt, db):
 
     return qa_chain
 
-# Return the chain
-def qa_pipeline():
+# Return the vector store
+def load_vector_store(quantization=None, rescore=True, embeddings=None):
     """
-    Create the QA pipeline
+    Load the FAISS vector store, optionally searching a scalar-quantized index
     """
+    import os
+    import pickle
+
+    from langchain.embeddings import HuggingFaceEmbeddings
+    from langchain.vectorstores import FAISS
+
     # Load the HuggingFace embeddings
-    embeddings = HuggingFaceEmbeddings()
+    if embeddings is None:
+        embeddings = HuggingFaceEmbeddings()
 
+    # Load the full float32 index
+    if not quantization:
+        return FAISS.load_local(FAISS_INDEX, embeddings)
+
+    # Pair the docstore with the quantized index built by quantize.py, without
+    # ever reading the float32 index.faiss into memory
+    from quantize import load_quantized_index
+
+    with open(os.path.join(FAISS_INDEX, "index.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    index = load_quantized_index(quantization, rescore, FAISS_INDEX)
+
+    return FAISS(embeddings.embed_query, index, docstore, index_to_docstore_id)
+
+# Return the chain
+def qa_pipeline(quantization=None, rescore=True):
+    """
+    Create the QA pipeline
+    """
     # Load the index
-    db = FAISS.load_local("vectorstore/", embeddings)
+    db = load_vector_store(quantization, rescore)
 
     # Load the LLM
     llm = load_llm()